@@ -70,6 +70,10 @@ class match_declaration_t(object):
         return self.does_match_exist(inst)
 
 
+# Name of the visitor method of each declaration or type class
+_visit_function_names = {}
+
+
 def apply_visitor(visitor, decl_inst):
     """
     Applies a visitor on declaration instance.
@@ -79,9 +83,13 @@ def apply_visitor(visitor, decl_inst):
 
     """
 
-    fname = 'visit_' + \
-        decl_inst.__class__.__name__[:-2]  # removing '_t' from class name
-    if not hasattr(visitor, fname):
+    fname = _visit_function_names.get(decl_inst.__class__)
+    if fname is None:
+        # removing '_t' from class name
+        fname = 'visit_' + decl_inst.__class__.__name__[:-2]
+        _visit_function_names[decl_inst.__class__] = fname
+    visit = getattr(visitor, fname, None)
+    if visit is None:
         raise runtime_errors.visit_function_has_not_been_found_t(
             visitor, decl_inst)
-    return getattr(visitor, fname)()
+    return visit()
@@ -28,6 +28,11 @@ class declaration_algs_cache_t(object):
         self._normalized_full_name_false = None
         self._container_traits = None
 
+    def __reduce__(self):
+        # The cached values can be computed again: they are not pickled,
+        # which keeps the declarations cache files smaller
+        return self.__class__, (), {'_enabled': self._enabled}
+
     def disable(self):
         self._enabled = False
 
@@ -220,6 +225,11 @@ class type_algs_cache_t(object):
         self._decl_string = None
         self._partial_decl_string = None
 
+    def __reduce__(self):
+        # The cached values can be computed again: they are not pickled,
+        # which keeps the declarations cache files smaller
+        return self.__class__, ()
+
     @property
     def remove_alias(self):
         return self._remove_alias
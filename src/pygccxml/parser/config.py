@@ -10,18 +10,32 @@ Defines C++ parser configuration classes.
 
 import os
 import copy
+import stat
 import platform
-import subprocess
+import shutil
+import sys
+import functools
 import warnings
-# In py3, ConfigParser was renamed to the more-standard configparser.
-# But there's a py3 backport that installs "configparser" in py2, and I don't
-# want it because it has annoying deprecation warnings. So try the real py2
-# import first
-# Inspired by https://bitbucket.org/ned/coveragepy/commits/f8e9d62f1412
-try:
-    from ConfigParser import SafeConfigParser as ConfigParser
-except ImportError:
-    from configparser import ConfigParser
+from configparser import ConfigParser
+
+# The platform does not change while the process runs
+_IS_WINDOWS = platform.system() == 'Windows'
+
+# Directories and xml generator executables that were already found on disk.
+# Only successful lookups are stored, so that a wrong path is always reported.
+_existing_directories = set()
+_existing_xml_generator_paths = set()
+
+
+def _intern(value):
+    """
+    Intern strings that are repeated across many configuration objects.
+
+    """
+
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
 
 
 class parser_configuration_t(object):
@@ -41,6 +55,20 @@ class parser_configuration_t(object):
 
     """
 
+    __slots__ = (
+        '__working_directory',
+        '__include_paths',
+        '__define_symbols',
+        '__undefine_symbols',
+        '__cflags_parts',
+        '__ccflags_parts',
+        '__compiler',
+        '__xml_generator',
+        '__castxml_epic_version',
+        '__keep_xml',
+        '__flags',
+        '__compiler_path')
+
     def __init__(
             self,
             working_directory='.',
@@ -61,23 +89,25 @@ class parser_configuration_t(object):
 
         if not include_paths:
             include_paths = []
-        self.__include_paths = include_paths
+        self.__include_paths = [_intern(p) for p in include_paths]
 
         if not define_symbols:
             define_symbols = []
-        self.__define_symbols = define_symbols
+        self.__define_symbols = [_intern(s) for s in define_symbols]
 
         if not undefine_symbols:
             undefine_symbols = []
-        self.__undefine_symbols = undefine_symbols
+        self.__undefine_symbols = [_intern(s) for s in undefine_symbols]
 
-        self.__cflags = cflags
+        # The flags are stored as lists and joined on access, so that
+        # appending flags does not copy the whole string each time
+        self.__cflags_parts = [cflags]
 
-        self.__ccflags = ccflags
+        self.__ccflags_parts = [ccflags]
 
-        self.__compiler = compiler
+        self.__compiler = _intern(compiler)
 
-        self.__xml_generator = xml_generator
+        self.__xml_generator = _intern(xml_generator)
 
         self.__castxml_epic_version = castxml_epic_version
 
@@ -88,11 +118,20 @@ class parser_configuration_t(object):
         self.__flags = flags
 
         # If no compiler path was set and we are using castxml, set the path
-        self.__compiler_path = create_compiler_path(
-            xml_generator, compiler_path)
+        self.__compiler_path = _intern(create_compiler_path(
+            xml_generator, compiler_path))
 
     def clone(self):
-        raise NotImplementedError(self.__class__.__name__)
+        # A shallow copy keeps the class and the attributes of subclasses;
+        # only the lists are mutable, so they are copied too.
+        cloned = copy.copy(self)
+        cloned.__include_paths = list(self.__include_paths)
+        cloned.__define_symbols = list(self.__define_symbols)
+        cloned.__undefine_symbols = list(self.__undefine_symbols)
+        cloned.__cflags_parts = list(self.__cflags_parts)
+        cloned.__ccflags_parts = list(self.__ccflags_parts)
+        cloned.__flags = copy.copy(self.__flags)
+        return cloned
 
     @property
     def working_directory(self):
@@ -125,7 +164,7 @@ class parser_configuration_t(object):
     @compiler.setter
     def compiler(self, compiler):
         """set compiler name to simulate"""
-        self.__compiler = compiler
+        self.__compiler = _intern(compiler)
 
     @property
     def xml_generator(self):
@@ -139,7 +178,7 @@ class parser_configuration_t(object):
             # Support for gccxml.real from newer gccxml package
             # Can be removed once gccxml support is dropped.
             xml_generator = "gccxml"
-        self.__xml_generator = xml_generator
+        self.__xml_generator = _intern(xml_generator)
 
     @property
     def castxml_epic_version(self):
@@ -185,19 +224,19 @@ class parser_configuration_t(object):
     @compiler_path.setter
     def compiler_path(self, compiler_path):
         """Set the path for the compiler."""
-        self.__compiler_path = compiler_path
+        self.__compiler_path = _intern(compiler_path)
 
     @property
     def cflags(self):
         """additional flags to pass to compiler"""
-        return self.__cflags
+        return ' '.join(self.__cflags_parts)
 
     @cflags.setter
     def cflags(self, val):
-        self.__cflags = val
+        self.__cflags_parts = [val]
 
     def append_cflags(self, val):
-        self.__cflags = self.__cflags + ' ' + val
+        self.__cflags_parts.append(val)
 
     @property
     def ccflags(self):
@@ -210,29 +249,36 @@ class parser_configuration_t(object):
         See `cc-opt` on castxml's documentation page:
         https://github.com/CastXML/CastXML/blob/master/doc/manual/castxml.1.rst
         """
-        return self.__ccflags
+        return ' '.join(self.__ccflags_parts)
 
     @ccflags.setter
     def ccflags(self, val):
-        self.__ccflags = val
+        self.__ccflags_parts = [val]
 
     def append_ccflags(self, val):
-        self.__ccflags = self.__ccflags + ' ' + val
+        self.__ccflags_parts.append(val)
 
     def __ensure_dir_exists(self, dir_path, meaning):
-        if os.path.isdir(dir_path):
+        # Relative paths depend on the current directory
+        abs_dir_path = os.path.abspath(dir_path)
+        if abs_dir_path in _existing_directories:
             return
-        if os.path.exists(self.working_directory):
+        # A single stat tells both if the path exists and if it is a directory
+        try:
+            is_dir = stat.S_ISDIR(os.stat(abs_dir_path).st_mode)
+        except OSError:
             msg = '%s("%s") does not exist.' % (meaning, dir_path)
-            if meaning == 'include directory':
-                # Warn instead of failing.
-                warnings.warn(msg, RuntimeWarning)
-            else:
-                raise RuntimeError(msg)
         else:
-            raise RuntimeError(
-                '%s("%s") should be "directory", not a file.' %
-                (meaning, dir_path))
+            if is_dir:
+                _existing_directories.add(abs_dir_path)
+                return
+            msg = '%s("%s") should be "directory", not a file.' % (
+                meaning, dir_path)
+        if meaning == 'include directory':
+            # Warn instead of failing.
+            warnings.warn(msg, RuntimeWarning)
+        else:
+            raise RuntimeError(msg)
 
     def raise_on_wrong_settings(self):
         """
@@ -256,6 +302,14 @@ class xml_generator_configuration_t(parser_configuration_t):
 
     """
 
+    __slots__ = (
+        '__gccxml_path',
+        '__xml_generator_path',
+        '__start_with_declarations',
+        '__ignore_gccxml_output',
+        '__xml_generator_from_xml_file',
+        '__validated_settings')
+
     def __init__(
             self,
             gccxml_path='',
@@ -290,8 +344,7 @@ class xml_generator_configuration_t(parser_configuration_t):
             flags=flags,
             castxml_epic_version=castxml_epic_version)
 
-        if gccxml_path != '':
-            self.__gccxml_path = gccxml_path
+        self.__gccxml_path = gccxml_path
         self.__xml_generator_path = xml_generator_path
 
         if not start_with_declarations:
@@ -302,8 +355,26 @@ class xml_generator_configuration_t(parser_configuration_t):
 
         self.__xml_generator_from_xml_file = None
 
+        self.__validated_settings = None
+
     def clone(self):
-        return copy.deepcopy(self)
+        cloned = parser_configuration_t.clone(self)
+        cloned.__start_with_declarations = list(
+            self.__start_with_declarations)
+        return cloned
+
+    @property
+    def gccxml_path(self):
+        """
+        GCC-XML binary location (unused, kept for backward compatibility)
+
+        """
+
+        return self.__gccxml_path
+
+    @gccxml_path.setter
+    def gccxml_path(self, new_path):
+        self.__gccxml_path = new_path
 
     @property
     def xml_generator_path(self):
@@ -350,13 +421,66 @@ class xml_generator_configuration_t(parser_configuration_t):
         self.__ignore_gccxml_output = val
 
     def raise_on_wrong_settings(self):
+        # The include paths can be changed in place, so instead of a flag
+        # reset by the setters, remember the values that were validated.
+        settings = (
+            self.working_directory,
+            tuple(self.include_paths),
+            self.xml_generator,
+            self.xml_generator_path)
+        if settings == self.__validated_settings:
+            return
         super(xml_generator_configuration_t, self).raise_on_wrong_settings()
-        if self.xml_generator_path is None or \
-                not os.path.isfile(self.xml_generator_path):
-            msg = (
-                'xml_generator_path("%s") should be set and exist.') \
-                % self.xml_generator_path
-            raise RuntimeError(msg)
+        if self.xml_generator_path not in _existing_xml_generator_paths:
+            if self.xml_generator_path is None or \
+                    not os.path.isfile(self.xml_generator_path):
+                msg = (
+                    'xml_generator_path("%s") should be set and exist.') \
+                    % self.xml_generator_path
+                raise RuntimeError(msg)
+            _existing_xml_generator_paths.add(self.xml_generator_path)
+        self.__validated_settings = settings
+
+
+def _attribute_setter(name, convert=None):
+    def setter(cfg, value):
+        if convert is not None:
+            value = convert(value)
+        setattr(cfg, name, value)
+    return setter
+
+
+def _to_bool(value):
+    if not isinstance(value, str):
+        # None, numbers...
+        return bool(value)
+    # Accept the same values as ConfigParser.getboolean()
+    states = ConfigParser.BOOLEAN_STATES
+    if value.lower() not in states:
+        raise ValueError('Not a boolean: %s' % value)
+    return states[value.lower()]
+
+
+def _add_include_paths(cfg, value):
+    paths = (p.strip() for p in value.split(';'))
+    cfg.include_paths.extend(os.path.normpath(p) for p in paths if p)
+
+
+# Configuration file entries, and how to apply them to a configuration object
+_configuration_setters = {
+    'gccxml_path': _attribute_setter('gccxml_path'),
+    'xml_generator_path': _attribute_setter('xml_generator_path'),
+    'working_directory': _attribute_setter('working_directory'),
+    'include_paths': _add_include_paths,
+    'compiler': _attribute_setter('compiler'),
+    'xml_generator': _attribute_setter('xml_generator'),
+    'castxml_epic_version': _attribute_setter('castxml_epic_version', int),
+    'keep_xml': _attribute_setter('keep_xml', _to_bool),
+    'cflags': _attribute_setter('cflags'),
+    'ccflags': _attribute_setter('ccflags'),
+    'flags': _attribute_setter('flags'),
+    'compiler_path': _attribute_setter('compiler_path'),
+}
 
 
 def load_xml_generator_configuration(configuration, **defaults):
@@ -381,10 +505,16 @@ def load_xml_generator_configuration(configuration, **defaults):
     unittests/xml_generator.cfg>`_.
 
     """
-    parser = configuration
     if isinstance(configuration, str):
-        parser = ConfigParser()
-        parser.read(configuration)
+        try:
+            mtime = os.path.getmtime(configuration)
+        except OSError:
+            # ConfigParser.read() silently ignores missing files
+            mtime = None
+        parser = _read_configuration_file(configuration, mtime)
+    else:
+        # Already parsed by the caller
+        parser = configuration
 
     # Create a new empty configuration
     cfg = xml_generator_configuration_t()
@@ -395,52 +525,44 @@ def load_xml_generator_configuration(configuration, **defaults):
 
     if parser.has_section('xml_generator'):
         for name, value in parser.items('xml_generator'):
-            if value.strip():
+            # Skip empty entries without building a stripped copy
+            if value and not value.isspace():
                 values[name] = value
 
     for name, value in values.items():
         if isinstance(value, str):
             value = value.strip()
-        if name == 'gccxml_path':
-            cfg.gccxml_path = value
-        if name == 'xml_generator_path':
-            cfg.xml_generator_path = value
-        elif name == 'working_directory':
-            cfg.working_directory = value
-        elif name == 'include_paths':
-            for p in value.split(';'):
-                p = p.strip()
-                if p:
-                    cfg.include_paths.append(os.path.normpath(p))
-        elif name == 'compiler':
-            cfg.compiler = value
-        elif name == 'xml_generator':
-            cfg.xml_generator = value
-        elif name == 'castxml_epic_version':
-            cfg.castxml_epic_version = int(value)
-        elif name == 'keep_xml':
-            cfg.keep_xml = value
-        elif name == 'cflags':
-            cfg.cflags = value
-        elif name == 'ccflags':
-            cfg.ccflags = value
-        elif name == 'flags':
-            cfg.flags = value
-        elif name == 'compiler_path':
-            cfg.compiler_path = value
+        setter = _configuration_setters.get(name)
+        if setter:
+            setter(cfg, value)
         else:
             print('\n%s entry was ignored' % name)
 
     # If no compiler path was set and we are using castxml, set the path
-    # Here we overwrite the default configuration done in the cfg because
+    # Here we complete the default configuration done in the cfg because
     # the xml_generator was set through the setter after the creation of a new
-    # emppty configuration object.
-    cfg.compiler_path = create_compiler_path(
-        cfg.xml_generator, cfg.compiler_path)
+    # empty configuration object.
+    if cfg.compiler_path is None:
+        cfg.compiler_path = create_compiler_path(cfg.xml_generator, None)
 
     return cfg
 
 
+@functools.lru_cache(maxsize=32)
+def _read_configuration_file(file_path, mtime):
+    """
+    Parse a configuration file.
+
+    The parsed file is cached; the modification time is part of the key so
+    that a file that was changed on disk is read again.
+
+    """
+
+    parser = ConfigParser()
+    parser.read(file_path)
+    return parser
+
+
 def create_compiler_path(xml_generator, compiler_path):
     """
     Try to guess a path for the compiler.
@@ -454,37 +576,39 @@ def create_compiler_path(xml_generator, compiler_path):
     """
 
     if xml_generator == 'castxml' and compiler_path is None:
-        if platform.system() == 'Windows':
-            # Look for msvc
-            compiler_path = __get_first_compiler_in_path('where', 'cl')
-            # No msvc found; look for mingw
-            if compiler_path == '':
-                compiler_path = __get_first_compiler_in_path('where', 'mingw')
-        else:
-            # OS X or Linux
-            # Look for clang first, then gcc
-            compiler_path = __get_first_compiler_in_path('which', 'clang++')
-            # No clang found; use gcc
-            if compiler_path == '':
-                compiler_path = __get_first_compiler_in_path('which', 'c++')
-
-        if compiler_path == "":
-            compiler_path = None
+        compiler_path = _guess_compiler_path()
 
     return compiler_path
 
 
-def __get_first_compiler_in_path(command, compiler_name):
-    p = subprocess.Popen(
-        [command, compiler_name],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE)
-    path = p.stdout.read().decode("utf-8").rstrip().split("\r\n")[0].rstrip()
-    p.wait()
-    p.stdout.close()
-    p.stderr.close()
-    return path
+@functools.lru_cache(maxsize=None)
+def _guess_compiler_path():
+    """
+    Look for a compiler in the PATH.
+
+    The lookup is only done once per process, as the result will not change
+    between two configuration objects.
+
+    """
+
+    if _IS_WINDOWS:
+        # Look for msvc, then for mingw
+        compilers = ('cl', 'mingw')
+    else:
+        # OS X or Linux
+        # Look for clang first, then gcc
+        compilers = ('clang++', 'c++')
+
+    for compiler_name in compilers:
+        compiler_path = shutil.which(compiler_name)
+        if compiler_path:
+            return compiler_path
+
+    return None
 
 
 if __name__ == '__main__':
-    print(load_xml_generator_configuration('xml_generator.cfg').__dict__)
+    cfg = load_xml_generator_configuration('xml_generator.cfg')
+    # The configuration classes use __slots__, print their properties
+    print({name: getattr(cfg, name) for name in dir(cfg)
+           if isinstance(getattr(type(cfg), name, None), property)})
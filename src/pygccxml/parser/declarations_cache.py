@@ -61,6 +61,21 @@ def configuration_signature(config):
     return sig.hexdigest()
 
 
+def _cache_version():
+    """
+    Return the version written in the cache files.
+
+    The cached declarations are pickled: files written by another version
+    of pygccxml may not load, or load wrong declarations.
+
+    """
+
+    # Imported here: pygccxml/__init__.py imports the parser package
+    # before it defines __version__
+    import pygccxml
+    return pygccxml.__version__
+
+
 class cache_base_t(object):
     logger = utils.loggers.declarations_cache
 
@@ -97,6 +112,35 @@ class cache_base_t(object):
 
         raise NotImplementedError()
 
+    def update_joined(self, source_files, configuration, declarations):
+        """
+        update the cache entry of the joined declarations of several files
+
+        Caches that do not store joined declarations ignore this call.
+
+        :param source_files: paths to the C++ source files, in the order
+               they were parsed
+        :param configuration: configuration used in
+               parsing :class:`xml_generator_configuration_t`
+        :param declarations: declaration tree found when parsing and joining
+               the files
+        """
+
+        pass
+
+    def cached_joined_value(self, source_files, configuration):
+        """
+        Return the joined declarations, we have cached, for the source_files
+        and the given configuration, or None.
+
+        :param source_files: paths to the C++ source files being parsed, in
+               the order they are parsed.
+        :param configuration: configuration that was used for parsing.
+
+        """
+
+        return None
+
 
 class record_t(object):
 
@@ -189,6 +233,21 @@ class file_cache_t(cache_base_t):
         try:
             file_cache_t.logger.info('Loading cache file "%s".', file_name)
             start_time = timeit.default_timer()
+            version = pickle.load(cache_file_obj)
+            if version != _cache_version():
+                # The pickled classes may have changed since: do not load
+                # the declarations that follow the version.
+                if not isinstance(version, str):
+                    # Written before the version was stored: the whole
+                    # cache, declarations included, has just been loaded
+                    # as the version.
+                    version = "older version"
+                file_cache_t.logger.info(
+                    "Cache file [%s] was written by pygccxml (%s). " +
+                    "Regenerating.", file_name, version)
+                cache_file_obj.close()
+                open(file_name, 'w+b').close()
+                return {}
             cache = pickle.load(cache_file_obj)
             file_cache_t.logger.debug(
                 "Cache file has been loaded in %.1f secs",
@@ -227,9 +286,13 @@ class file_cache_t(cache_base_t):
             self.logger.debug(
                 "There are %s removed entries from cache.",
                 num_removed)
-        # Save out the cache to disk
-        with open(self.__name, "w+b") as cache_file:
+        # Save out the cache to disk. The file is replaced once complete, so
+        # that an interrupted flush does not leave a truncated cache behind.
+        temp_name = self.__name + ".tmp"
+        with open(temp_name, "w+b") as cache_file:
+            pickle.dump(_cache_version(), cache_file, pickle.HIGHEST_PROTOCOL)
             pickle.dump(self.__cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, self.__name)
 
     def update(self, source_file, configuration, declarations, included_files):
         """ Update a cached record with the current key and value contents. """
@@ -242,7 +305,7 @@ class file_cache_t(cache_base_t):
                 map(
                     file_signature,
                     included_files)),
-            declarations=declarations)
+            declarations=self.__dumps(declarations))
         # Switched over to holding full record in cache so we don't have
         # to keep creating records in the next method.
         self.__cache[record.key()] = record
@@ -264,12 +327,89 @@ class file_cache_t(cache_base_t):
         record = self.__cache[key]
         if self.__is_valid_signature(record):
             record.was_hit = True  # Record cache hit
-            return record.declarations
+            return self.__loads(record.declarations)
 
         # some file has been changed
         del self.__cache[key]
         return None
 
+    def update_joined(self, source_files, configuration, declarations):
+        """
+        Update the cached joined declarations of the source files.
+
+        The entry keeps the included files of the entry of each source file,
+        and is valid as long as none of them changed. Nothing is cached if
+        one of the source files has no entry.
+
+        """
+
+        config_signature = configuration_signature(configuration)
+        keys = tuple(
+            (file_signature(source_file), config_signature)
+            for source_file in source_files)
+        included_files = []
+        included_files_signature = []
+        for key in keys:
+            file_record = self.__cache.get(key)
+            if file_record is None:
+                return
+            for index, included_file in \
+                    enumerate(file_record.included_files):
+                if included_file in included_files:
+                    continue
+                included_files.append(included_file)
+                included_files_signature.append(
+                    file_record.included_files_signature[index])
+        record = record_t(
+            source_signature=keys,
+            config_signature=config_signature,
+            included_files=included_files,
+            included_files_signature=included_files_signature,
+            declarations=self.__dumps(declarations))
+        self.__cache[record.key()] = record
+        self.__needs_flushed = True
+
+    def cached_joined_value(self, source_files, configuration):
+        """
+        Attempt to lookup the cached joined declarations for the given files
+        and configuration.
+
+        Returns None if the declarations are not found, or if one of the
+        included files has been changed.
+
+        """
+
+        config_signature = configuration_signature(configuration)
+        keys = tuple(
+            (file_signature(source_file), config_signature)
+            for source_file in source_files)
+        key = (keys, config_signature)
+        record = self.__cache.get(key)
+        if record is None:
+            return None
+        if not self.__is_valid_signature(record):
+            # some file has been changed
+            del self.__cache[key]
+            return None
+        # Keep the entries of the files, they are read again when one of
+        # the other files changes
+        for file_key in keys:
+            if file_key in self.__cache:
+                self.__cache[file_key].was_hit = True
+        record.was_hit = True
+        return self.__loads(record.declarations)
+
+    @staticmethod
+    def __dumps(declarations):
+        # Keep a snapshot of the declarations: the trees returned by the
+        # cache are modified when the declarations of several files are
+        # joined, and must not end up in the cache file.
+        return pickle.dumps(declarations, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def __loads(declarations):
+        return pickle.loads(declarations)
+
     @staticmethod
     def __is_valid_signature(record):
         for index, included_file in enumerate(record.included_files):
@@ -16,32 +16,51 @@ def bind_aliases(decls):
 
     """
 
-    visited = set()
-    typedefs = [
-        decl for decl in decls if isinstance(decl, declarations.typedef_t)]
+    # Local names for the lookups done for every declaration
+    typedef_t = declarations.typedef_t
+    remove_alias = declarations.remove_alias
+    declarated_t = declarations.declarated_t
+    class_types = declarations.class_types
+
+    # Group the typedefs by the class they refer to (by id, classes are
+    # compared by value)
+    aliases = {}
+    typedefs = (decl for decl in decls if isinstance(decl, typedef_t))
     for decl in typedefs:
-        type_ = declarations.remove_alias(decl.decl_type)
-        if not isinstance(type_, declarations.declarated_t):
+        type_ = remove_alias(decl.decl_type)
+        if not isinstance(type_, declarated_t):
             continue
         cls_inst = type_.declaration
-        if not isinstance(cls_inst, declarations.class_types):
+        if not isinstance(cls_inst, class_types):
             continue
-        if id(cls_inst) not in visited:
-            visited.add(id(cls_inst))
-            del cls_inst.aliases[:]
-        cls_inst.aliases.append(decl)
+        group = aliases.get(id(cls_inst))
+        if group is None:
+            aliases[id(cls_inst)] = (cls_inst, [decl])
+        else:
+            group[1].append(decl)
+
+    for cls_inst, group in aliases.values():
+        cls_inst.aliases[:] = group
 
 
 def join_declarations(namespace):
-    _join_namespaces(namespace)
-    for ns in namespace.declarations:
-        if isinstance(ns, declarations.namespace_t):
-            join_declarations(ns)
+    # Walk the namespaces with an explicit stack, so that deeply nested
+    # namespaces do not hit the recursion limit
+    namespace_t = declarations.namespace_t
+    stack = [namespace]
+    while stack:
+        ns = stack.pop()
+        _join_namespaces(ns)
+        # Reversed, to join the nested namespaces in declaration order
+        stack.extend(
+            decl for decl in reversed(ns.declarations)
+            if isinstance(decl, namespace_t))
 
 
 def _join_namespaces(namespace):
     ddhash = {}
-    decls = []
+    # Joined declarations by id, in declaration order
+    decls = {}
 
     for decl in namespace.declarations:
         _fill_declarations(ddhash, decls, decl)
@@ -53,49 +72,73 @@ def _join_namespaces(namespace):
         # Remove the second one from the declaration tree
         _remove_second_class(ddhash, decls, class_t, class_declaration_t)
 
-    namespace.declarations = decls
+    namespace.declarations = list(decls.values())
 
 
 def _fill_declarations(ddhash, decls, decl):
-    if decl.__class__ not in ddhash:
-        ddhash[decl.__class__] = {decl.name: [decl]}
-        decls.append(decl)
+    decl_class = decl.__class__
+    if decl_class not in ddhash:
+        ddhash[decl_class] = {decl.name: [decl]}
+        decls[id(decl)] = decl
     else:
-        joined_decls = ddhash[decl.__class__]
-        if decl.name not in joined_decls:
-            decls.append(decl)
-            joined_decls[decl.name] = [decl]
+        joined_decls = ddhash[decl_class]
+        name = decl.name
+        if name not in joined_decls:
+            decls[id(decl)] = decl
+            joined_decls[name] = [decl]
         else:
-            if isinstance(decl, declarations.calldef_t):
-                if decl not in joined_decls[decl.name]:
-                    # functions has overloading
-                    decls.append(decl)
-                    joined_decls[decl.name].append(decl)
-            elif isinstance(decl, declarations.enumeration_t):
-                # unnamed enums
-                if not decl.name and decl not in \
-                        joined_decls[decl.name]:
-                    decls.append(decl)
-                    joined_decls[decl.name].append(decl)
-            elif isinstance(decl, declarations.class_t):
-                # unnamed classes
-                if not decl.name and decl not in \
-                        joined_decls[decl.name]:
-                    decls.append(decl)
-                    joined_decls[decl.name].append(decl)
-            elif isinstance(decl, declarations.namespace_t):
-                joined_decls[decl.name][0].take_parenting(decl)
+            try:
+                handler = _same_name_handlers[decl_class]
+            except KeyError:
+                handler = _find_same_name_handler(decl_class)
+            if handler is not None:
+                handler(joined_decls[name], decls, decl)
+
+
+def _join_calldef(same_name_decls, decls, decl):
+    if decl not in same_name_decls:
+        # functions has overloading
+        decls[id(decl)] = decl
+        same_name_decls.append(decl)
+
+
+def _join_unnamed(same_name_decls, decls, decl):
+    # unnamed enums and classes
+    if not decl.name and decl not in same_name_decls:
+        decls[id(decl)] = decl
+        same_name_decls.append(decl)
+
+
+def _join_namespace(same_name_decls, decls, decl):
+    same_name_decls[0].take_parenting(decl)
+
+
+# Handler to use for a declaration which has the same name as an already
+# joined one, by declaration class. Filled on first use of each class.
+_same_name_handlers = {}
+
+
+def _find_same_name_handler(decl_class):
+    if issubclass(decl_class, declarations.calldef_t):
+        handler = _join_calldef
+    elif issubclass(decl_class, declarations.enumeration_t):
+        handler = _join_unnamed
+    elif issubclass(decl_class, declarations.class_t):
+        handler = _join_unnamed
+    elif issubclass(decl_class, declarations.namespace_t):
+        handler = _join_namespace
+    else:
+        handler = None
+    _same_name_handlers[decl_class] = handler
+    return handler
 
 
 def _remove_second_class(ddhash, decls, class_t, class_declaration_t):
-    class_names = set()
-    for name, same_name_classes in ddhash[class_t].items():
-        if not name:
-            continue
-        if same_name_classes[0].mangled:
-            class_names.add(same_name_classes[0].mangled)
-        else:
-            class_names.add(same_name_classes[0].name)
+    # Classes are identified by their mangled name with gccxml, and by their
+    # name with castxml (which does not provide a mangled name for them)
+    class_names = set(
+        same_name_classes[0].mangled or same_name_classes[0].name
+        for name, same_name_classes in ddhash[class_t].items() if name)
 
     class_declarations = ddhash[class_declaration_t]
     for name, same_name_class_declarations in \
@@ -103,10 +146,8 @@ def _remove_second_class(ddhash, decls, class_t, class_declaration_t):
         if not name:
             continue
         for class_declaration in same_name_class_declarations:
-            if class_declaration.mangled is not None:
-                # gccxml
-                if class_declaration.mangled in class_names:
-                    decls.remove(class_declaration)
-            elif class_declaration.name in class_names:
-                # castxml
-                decls.remove(class_declaration)
+            key = class_declaration.mangled
+            if key is None:
+                key = class_declaration.name
+            if key in class_names:
+                decls.pop(id(class_declaration), None)
@@ -6,7 +6,13 @@
 # keep py2exe happy
 import xml.etree.ElementTree  # pylint: disable=W0611
 
-import xml.etree.cElementTree as ElementTree
+try:
+    # lxml is optional, but parses the xml files faster
+    from lxml import etree as ElementTree
+    _iterparse_options = {"huge_tree": True}
+except ImportError:
+    import xml.etree.cElementTree as ElementTree
+    _iterparse_options = {}
 
 from . import scanner
 
@@ -19,11 +25,23 @@ class ietree_scanner_t(scanner.scanner_t):
     def read(self):
         context = ElementTree.iterparse(
             self.xml_file,
-            events=("start", "end"))
+            events=("start", "end"),
+            **_iterparse_options)
+        root = None
+        depth = 0
         for event, elem in context:
             if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
                 self.startElement(elem.tag, elem.attrib)
             else:
+                depth -= 1
                 self.endElement(elem.tag)
                 elem.clear()
+                if depth == 1:
+                    # The cleared element is still referenced by the root
+                    # element: drop it, so that the memory used does not
+                    # grow with the size of the xml file.
+                    del root[:]
         self.endDocument()
@@ -170,7 +170,7 @@ class project_reader_t(object):
 
     """parses header files and returns the contained declarations"""
 
-    def __init__(self, config, cache=None, decl_factory=None):
+    def __init__(self, config, cache=None, decl_factory=None, jobs=1):
         """
         :param config: GCCXML configuration
         :type config: :class:xml_generator_configuration_t
@@ -181,6 +181,14 @@ class project_reader_t(object):
 
         :param decl_factory: declaration factory
         :type decl_factory: :class:`decl_factory_t`
+
+        :param jobs: number of worker processes that may parse source files
+                     in parallel when parsing files one by one (see
+                     :meth:`source_reader_t.read_cpp_source_files`). None
+                     uses the number of CPUs. The workers import the main
+                     module, which must be guarded by
+                     ``if __name__ == "__main__":``.
+        :type jobs: int
         """
 
         self.__config = config
@@ -195,6 +203,10 @@ class project_reader_t(object):
         if not decl_factory:
             self.__decl_factory = pygccxml.declarations.decl_factory_t()
 
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        self.__jobs = jobs
+
         self.logger = utils.loggers.cxx_parser
         self.__xml_generator_from_xml_file = None
 
@@ -265,62 +277,64 @@ class project_reader_t(object):
 
     def __parse_file_by_file(self, files):
         namespaces = []
-        config = self.__config.clone()
         self.logger.debug("Reading project files: file by file")
+        readers = []
+        # Files parsed with the same declarations to start with share their
+        # reader, so that they can be read in parallel
+        shared_readers = {}
         for prj_file in files:
 
             if isinstance(prj_file, file_configuration_t):
-                del config.start_with_declarations[:]
-                config.start_with_declarations.extend(
-                    prj_file.start_with_declarations)
+                start_with_declarations = prj_file.start_with_declarations
                 header = prj_file.data
                 content_type = prj_file.content_type
             else:
-                config = self.__config
+                start_with_declarations = self.__config.start_with_declarations
                 header = prj_file
                 content_type = \
                     file_configuration_t.CONTENT_TYPE.STANDARD_SOURCE_FILE
 
-            reader = source_reader.source_reader_t(
-                config,
-                self.__dcache,
-                self.__decl_factory)
-
-            if content_type == \
-                    file_configuration_t.CONTENT_TYPE.STANDARD_SOURCE_FILE:
-                self.logger.info('Parsing source file "%s" ... ', header)
-                decls = reader.read_file(header)
-            elif content_type == \
-                    file_configuration_t.CONTENT_TYPE.GCCXML_GENERATED_FILE:
-                self.logger.info('Parsing xml file "%s" ... ', header)
-                decls = reader.read_xml_file(header)
-            elif content_type == \
-                    file_configuration_t.CONTENT_TYPE.CACHED_SOURCE_FILE:
-                # TODO: raise error when header file does not exist
-                if not os.path.exists(prj_file.cached_source_file):
-                    dir_ = os.path.split(prj_file.cached_source_file)[0]
-                    if dir_ and not os.path.exists(dir_):
-                        os.makedirs(dir_)
-                    self.logger.info(
-                        'Creating xml file "%s" from source file "%s" ... ',
-                        prj_file.cached_source_file, header)
-                    reader.create_xml_file(header, prj_file.cached_source_file)
-                self.logger.info(
-                    'Parsing xml file "%s" ... ',
-                    prj_file.cached_source_file)
-                decls = reader.read_xml_file(prj_file.cached_source_file)
+            key = tuple(start_with_declarations)
+            reader = shared_readers.get(key)
+            if reader is None:
+                config = self.__config.clone()
+                del config.start_with_declarations[:]
+                config.start_with_declarations.extend(start_with_declarations)
+                reader = source_reader.source_reader_t(
+                    config,
+                    self.__dcache,
+                    self.__decl_factory)
+                shared_readers[key] = reader
+            readers.append((reader, prj_file, header, content_type))
+
+        # The joined declarations are only cached when every file is a plain
+        # path: file configurations may change what is parsed without
+        # changing the cache key.
+        source_files = None
+        if files and all(isinstance(prj_file, str) for prj_file in files):
+            source_files = [
+                reader.file_full_name(header)
+                for reader, _, header, _ in readers]
+            answer = self.__dcache.cached_joined_value(
+                source_files, self.__config)
+            if answer is not None:
+                self.logger.debug(
+                    "Files have not been changed, reading joined " +
+                    "declarations from cache.")
+                return answer
+
+        parsed = self.__read_source_files(readers)
+        for index, (reader, prj_file, header, content_type) in \
+                enumerate(readers):
+            if index in parsed:
+                decls = parsed[index]
             else:
-                decls = reader.read_string(header)
+                decls = self.__read_file(
+                    reader, prj_file, header, content_type)
             self.__xml_generator_from_xml_file = \
                 reader.xml_generator_from_xml_file
             namespaces.append(decls)
 
-        self.logger.debug("Flushing cache... ")
-        start_time = timeit.default_timer()
-        self.__dcache.flush()
-        self.logger.debug(
-            "Cache has been flushed in %.1f secs",
-            (timeit.default_timer() - start_time))
         answer = []
         self.logger.debug("Joining namespaces ...")
         for file_nss in namespaces:
@@ -335,8 +349,74 @@ class project_reader_t(object):
         self._relink_declarated_types(leaved_classes, types)
         declarations_joiner.bind_aliases(
             pygccxml.declarations.make_flatten(answer))
+
+        if source_files is not None:
+            self.__dcache.update_joined(source_files, self.__config, answer)
+        self.logger.debug("Flushing cache... ")
+        start_time = timeit.default_timer()
+        self.__dcache.flush()
+        self.logger.debug(
+            "Cache has been flushed in %.1f secs",
+            (timeit.default_timer() - start_time))
         return answer
 
+    def __read_source_files(self, readers):
+        """
+        Reads the standard source files in parallel, with
+        :meth:`source_reader_t.read_cpp_source_files`.
+
+        Returns a dict mapping the index of a source file to its
+        declarations. Nothing is read when a single job is allowed.
+
+        """
+
+        if self.__jobs < 2:
+            return {}
+
+        groups = {}
+        for index, (reader, _, header, content_type) in enumerate(readers):
+            if content_type == \
+                    file_configuration_t.CONTENT_TYPE.STANDARD_SOURCE_FILE:
+                groups.setdefault(id(reader), (reader, []))[1].append(
+                    (index, header))
+
+        parsed = {}
+        for reader, group in groups.values():
+            for _, header in group:
+                self.logger.info('Parsing source file "%s" ... ', header)
+            decls = reader.read_cpp_source_files(
+                [header for _, header in group], self.__jobs)
+            for (index, _), file_decls in zip(group, decls):
+                parsed[index] = file_decls
+        return parsed
+
+    def __read_file(self, reader, prj_file, header, content_type):
+        if content_type == \
+                file_configuration_t.CONTENT_TYPE.STANDARD_SOURCE_FILE:
+            self.logger.info('Parsing source file "%s" ... ', header)
+            return reader.read_cpp_source_file(header)
+        elif content_type == \
+                file_configuration_t.CONTENT_TYPE.GCCXML_GENERATED_FILE:
+            self.logger.info('Parsing xml file "%s" ... ', header)
+            return reader.read_xml_file(header)
+        elif content_type == \
+                file_configuration_t.CONTENT_TYPE.CACHED_SOURCE_FILE:
+            # TODO: raise error when header file does not exist
+            if not os.path.exists(prj_file.cached_source_file):
+                dir_ = os.path.split(prj_file.cached_source_file)[0]
+                if dir_ and not os.path.exists(dir_):
+                    os.makedirs(dir_)
+                self.logger.info(
+                    'Creating xml file "%s" from source file "%s" ... ',
+                    prj_file.cached_source_file, header)
+                reader.create_xml_file(header, prj_file.cached_source_file)
+            self.logger.info(
+                'Parsing xml file "%s" ... ',
+                prj_file.cached_source_file)
+            return reader.read_xml_file(prj_file.cached_source_file)
+        else:
+            return reader.read_string(header)
+
     def __parse_all_at_once(self, files):
         config = self.__config.clone()
         self.logger.debug("Reading project files: all at once")
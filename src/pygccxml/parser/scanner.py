@@ -99,57 +99,13 @@ class scanner_t(xml.sax.handler.ContentHandler):
         self.logger = utils.loggers.cxx_parser
         self.xml_file = xml_file
         self.config = config
-        self.__readers = {
-            XML_NN_FILE: self.__read_file,
-            XML_NN_NAMESPACE: self.__read_namespace,
-            XML_NN_ENUMERATION: self.__read_enumeration,
-            XML_NN_ENUMERATION_VALUE: self.__read_enumeration_value,
-            XML_NN_ARRAY_TYPE: self.__read_array_type,
-            XML_NN_CV_QUALIFIED_TYPE: self.__read_cv_qualified_type,
-            XML_NN_POINTER_TYPE: self.__read_pointer_type,
-            XML_NN_REFERENCE_TYPE: self.__read_reference_type,
-            XML_NN_ELABORATED_TYPE: self.__read_elaborated_type,
-            XML_NN_FUNDAMENTAL_TYPE: self.__read_fundamental_type,
-            XML_NN_ARGUMENT: self.__read_argument,
-            XML_NN_FUNCTION_TYPE: self.__read_function_type,
-            XML_NN_METHOD_TYPE: self.__read_method_type,
-            XML_NN_OFFSET_TYPE: self.__read_offset_type,
-            XML_NN_TYPEDEF: self.__read_typedef,
-            XML_NN_VARIABLE: self.__read_variable,
-            XML_NN_CLASS: self.__read_class,
-            XML_NN_STRUCT: self.__read_struct,
-            XML_NN_UNION: self.__read_union,
-            XML_NN_FIELD: self.__read_field,
-            XML_NN_CASTING_OPERATOR: self.__read_casting_operator,
-            XML_NN_COMMENT: self.__read_comment,
-            XML_NN_CONSTRUCTOR: self.__read_constructor,
-            XML_NN_DESTRUCTOR: self.__read_destructor,
-            XML_NN_FUNCTION: self.__read_function,
-            XML_NN_FREE_OPERATOR: self.__read_free_operator,
-            XML_NN_MEMBER_OPERATOR: self.__read_member_operator,
-            XML_NN_METHOD: self.__read_method,
-            XML_NN_GCC_XML: self.__read_version,
-            XML_NN_CASTXML: self.__read_version,
-            XML_NN_ELLIPSIS: self.__read_ellipsis}
-        self.deep_declarations = [
-            XML_NN_CASTING_OPERATOR,
-            XML_NN_CONSTRUCTOR,
-            XML_NN_DESTRUCTOR,
-            XML_NN_ENUMERATION,
-            XML_NN_FILE,
-            XML_NN_COMMENT,
-            XML_NN_FUNCTION,
-            XML_NN_FREE_OPERATOR,
-            XML_NN_MEMBER_OPERATOR,
-            XML_NN_METHOD,
-            XML_NN_FUNCTION_TYPE,
-            XML_NN_METHOD_TYPE]
-
         assert isinstance(decl_factory, declarations.decl_factory_t)
         self.__decl_factory = decl_factory
 
         # mapping from id -> decl
         self.__declarations = {}
+        # namespaces without a parent
+        self.__root_namespaces = []
         # list of all read declarations
         self.__calldefs = []
         # list of enums I need later
@@ -265,6 +221,9 @@ class scanner_t(xml.sax.handler.ContentHandler):
     def declarations(self):
         return self.__declarations
 
+    def root_namespaces(self):
+        return self.__root_namespaces
+
     def calldefs(self):
         return self.__calldefs
 
@@ -286,9 +245,10 @@ class scanner_t(xml.sax.handler.ContentHandler):
     def startElement(self, name, attrs):
 
         try:
-            if name not in self.__readers:
+            reader = self.__readers.get(name)
+            if reader is None:
                 return
-            obj = self.__readers[name](attrs)
+            obj = reader(self, attrs)
             if not obj:
                 return  # it means that we worked on internals
                 # for example EnumValue of function argument
@@ -316,6 +276,8 @@ class scanner_t(xml.sax.handler.ContentHandler):
                 self.__declarations[element_id] = obj
                 if not isinstance(obj, declarations.namespace_t):
                     self.__read_location(obj, attrs, self.__name_attrs_to_skip)
+                elif not attrs.get(XML_AN_CONTEXT):
+                    self.__root_namespaces.append(obj)
                 if isinstance(obj, declarations.class_t):
                     self.__read_bases(obj, attrs)
                 self.__read_artificial(obj, attrs)
@@ -440,8 +402,7 @@ class scanner_t(xml.sax.handler.ContentHandler):
     def __read_root(self, attrs):
         pass
 
-    @staticmethod
-    def __read_file(attrs):
+    def __read_file(self, attrs):
         return attrs.get(XML_AN_NAME, '')
 
     def __read_namespace(self, attrs):
@@ -502,8 +463,7 @@ class scanner_t(xml.sax.handler.ContentHandler):
             # warnings.warn( msg )
         return declarations.array_t(type_, size + 1)
 
-    @staticmethod
-    def __read_cv_qualified_type(attrs):
+    def __read_cv_qualified_type(self, attrs):
         if XML_AN_CONST in attrs and XML_AN_VOLATILE in attrs:
             return declarations.volatile_t(
                 declarations.const_t(attrs[XML_AN_TYPE]))
@@ -516,20 +476,16 @@ class scanner_t(xml.sax.handler.ContentHandler):
         else:
             assert 0
 
-    @staticmethod
-    def __read_pointer_type(attrs):
+    def __read_pointer_type(self, attrs):
         return declarations.pointer_t(attrs[XML_AN_TYPE])
 
-    @staticmethod
-    def __read_reference_type(attrs):
+    def __read_reference_type(self, attrs):
         return declarations.reference_t(attrs[XML_AN_TYPE])
 
-    @staticmethod
-    def __read_elaborated_type(attrs):
+    def __read_elaborated_type(self, attrs):
         return declarations.elaborated_t(attrs[XML_AN_TYPE])
 
-    @staticmethod
-    def __read_fundamental_type(attrs):
+    def __read_fundamental_type(self, attrs):
         try:
             return declarations.FUNDAMENTAL_TYPES[attrs.get(XML_AN_NAME, '')]
         except KeyError:
@@ -740,3 +696,53 @@ class scanner_t(xml.sax.handler.ContentHandler):
         if "new" in operator.name or "delete" in operator.name:
             space = " "
         operator.name = "operator" + space + operator.name
+
+    # The xml elements readers, called with the scanner and the attributes
+    # of the element. The table is only built once, for all the scanners.
+    __readers = {
+        XML_NN_FILE: __read_file,
+        XML_NN_NAMESPACE: __read_namespace,
+        XML_NN_ENUMERATION: __read_enumeration,
+        XML_NN_ENUMERATION_VALUE: __read_enumeration_value,
+        XML_NN_ARRAY_TYPE: __read_array_type,
+        XML_NN_CV_QUALIFIED_TYPE: __read_cv_qualified_type,
+        XML_NN_POINTER_TYPE: __read_pointer_type,
+        XML_NN_REFERENCE_TYPE: __read_reference_type,
+        XML_NN_ELABORATED_TYPE: __read_elaborated_type,
+        XML_NN_FUNDAMENTAL_TYPE: __read_fundamental_type,
+        XML_NN_ARGUMENT: __read_argument,
+        XML_NN_FUNCTION_TYPE: __read_function_type,
+        XML_NN_METHOD_TYPE: __read_method_type,
+        XML_NN_OFFSET_TYPE: __read_offset_type,
+        XML_NN_TYPEDEF: __read_typedef,
+        XML_NN_VARIABLE: __read_variable,
+        XML_NN_CLASS: __read_class,
+        XML_NN_STRUCT: __read_struct,
+        XML_NN_UNION: __read_union,
+        XML_NN_FIELD: __read_field,
+        XML_NN_CASTING_OPERATOR: __read_casting_operator,
+        XML_NN_COMMENT: __read_comment,
+        XML_NN_CONSTRUCTOR: __read_constructor,
+        XML_NN_DESTRUCTOR: __read_destructor,
+        XML_NN_FUNCTION: __read_function,
+        XML_NN_FREE_OPERATOR: __read_free_operator,
+        XML_NN_MEMBER_OPERATOR: __read_member_operator,
+        XML_NN_METHOD: __read_method,
+        XML_NN_GCC_XML: __read_version,
+        XML_NN_CASTXML: __read_version,
+        XML_NN_ELLIPSIS: __read_ellipsis}
+
+    # Elements that are the parent of the next elements
+    deep_declarations = frozenset([
+        XML_NN_CASTING_OPERATOR,
+        XML_NN_CONSTRUCTOR,
+        XML_NN_DESTRUCTOR,
+        XML_NN_ENUMERATION,
+        XML_NN_FILE,
+        XML_NN_COMMENT,
+        XML_NN_FUNCTION,
+        XML_NN_FREE_OPERATOR,
+        XML_NN_MEMBER_OPERATOR,
+        XML_NN_METHOD,
+        XML_NN_FUNCTION_TYPE,
+        XML_NN_METHOD_TYPE])
@@ -3,9 +3,14 @@
 # Distributed under the Boost Software License, Version 1.0.
 # See http://www.boost.org/LICENSE_1_0.txt
 
+import concurrent.futures
+import gc
+import multiprocessing
 import os
 import platform
+import shlex
 import subprocess
+import tempfile
 
 from pygccxml import declarations
 
@@ -18,6 +23,60 @@ from .etree_scanner import ietree_scanner_t as scanner_t
 
 from .. import utils
 
+_IS_WINDOWS = platform.system() == 'Windows'
+
+
+def _split_windows_flags(flags):
+    """
+    Split flags into arguments, following the rules of the Microsoft C
+    runtime: the arguments given to the xml generator are the ones it
+    would have received from the command line.
+
+    Backslashes are only special when they precede a double quote.
+
+    """
+
+    args = []
+    arg = []
+    in_arg = False
+    in_quotes = False
+    backslashes = 0
+    i = 0
+    while i < len(flags):
+        char = flags[i]
+        if char == '\\':
+            backslashes += 1
+            in_arg = True
+        elif char == '"':
+            arg.append('\\' * (backslashes // 2))
+            if backslashes % 2:
+                arg.append('"')
+            elif in_quotes and flags[i + 1:i + 2] == '"':
+                # "" in a quoted argument is a literal quote
+                arg.append('"')
+                i += 1
+            else:
+                in_quotes = not in_quotes
+            backslashes = 0
+            in_arg = True
+        elif char in ' \t' and not in_quotes:
+            arg.append('\\' * backslashes)
+            backslashes = 0
+            if in_arg:
+                args.append(''.join(arg))
+                arg = []
+                in_arg = False
+        else:
+            arg.append('\\' * backslashes)
+            arg.append(char)
+            backslashes = 0
+            in_arg = True
+        i += 1
+    arg.append('\\' * backslashes)
+    if in_arg:
+        args.append(''.join(arg))
+    return args
+
 
 class source_reader_t(object):
     """
@@ -42,7 +101,9 @@ class source_reader_t(object):
         """
         :param configuration:
                        Instance of :class:`xml_generator_configuration_t`
-                       class, that contains CastXML configuration.
+                       class, that contains CastXML configuration. The
+                       reader keeps a copy of it: later changes to the
+                       configuration do not apply to this reader.
 
         :param cache: Reference to cache object, that will be updated after a
                       file has been parsed.
@@ -55,11 +116,14 @@ class source_reader_t(object):
         """
 
         self.logger = utils.loggers.cxx_parser
-        self.__search_directories = []
-        self.__config = configuration
+        # The command line and the cache keys must come from the same
+        # options, even if the configuration is changed afterwards
+        self.__config = configuration.clone()
         self.__cxx_std = utils.cxx_standard(configuration.cflags)
-        self.__search_directories.append(configuration.working_directory)
-        self.__search_directories.extend(configuration.include_paths)
+        search_directories = [configuration.working_directory]
+        search_directories.extend(configuration.include_paths)
+        # Without duplicates, keeping the first occurrence
+        self.__search_directories = list(dict.fromkeys(search_directories))
         if not cache:
             cache = declarations_cache.dummy_cache_t()
         self.__dcache = cache
@@ -68,6 +132,11 @@ class source_reader_t(object):
         if not decl_factory:
             self.__decl_factory = declarations.decl_factory_t()
         self.__xml_generator_from_xml_file = None
+        # File names already looked up by __file_full_name
+        self.__full_names = {}
+        self.__existing_search_directories = None
+        # Options of the xml generator, built on first use
+        self.__command_line_prefix = None
 
     @property
     def xml_generator_from_xml_file(self):
@@ -84,35 +153,63 @@ class source_reader_t(object):
         """
         Generate the command line used to build xml files.
 
+        The command line is a list of arguments, that is run without a
+        shell.
+
         """
         return self.__create_command_line_castxml(source_file, xml_file)
 
+    @staticmethod
+    def __split_flags(flags):
+        # Backslashes are path separators on Windows, not escape characters
+        if _IS_WINDOWS:
+            return _split_windows_flags(flags)
+        return shlex.split(flags)
+
     def __create_command_line_common(self):
         assert isinstance(self.__config, config.xml_generator_configuration_t)
 
         cmd = []
 
-        # Add xml generator executable (between "" for windows)
-        cmd.append('"%s"' % os.path.normpath(self.__config.xml_generator_path))
+        # Add xml generator executable
+        cmd.append(os.path.normpath(self.__config.xml_generator_path))
 
         # Add all passed cflags
         if self.__config.cflags != "":
-            cmd.append(" %s " % self.__config.cflags)
+            cmd.extend(self.__split_flags(self.__config.cflags))
 
         # Add additional includes directories
-        dirs = self.__search_directories
-        cmd.append(''.join([' -I"%s"' % search_dir for search_dir in dirs]))
+        # Missing directories would only cost CastXML useless lookups
+        dirs = self.__existing_directories()
+        cmd.extend('-I' + search_dir for search_dir in dirs)
 
         return cmd
 
     def __create_command_line_castxml(self, source_file, xmlfile):
 
+        # The options only depend on the configuration: build them once
+        if self.__command_line_prefix is None:
+            self.__command_line_prefix = \
+                self.__create_command_line_castxml_prefix()
+        cmd = self.__command_line_prefix + ['-o', xmlfile, source_file]
+
+        # Where to start the parsing
+        if self.__config.start_with_declarations:
+            cmd.extend([
+                '--castxml-start',
+                ','.join(self.__config.start_with_declarations)])
+        self.logger.debug(
+            'castxml cmd: %s', ' '.join(shlex.quote(arg) for arg in cmd))
+        return cmd
+
+    def __create_command_line_castxml_prefix(self):
+
         cmd = self.__create_command_line_common()
 
         # Clang option: -c Only run preprocess, compile, and assemble steps
         cmd.append("-c")
         # Clang option: make sure clang knows we want to parse c++
-        cmd.append("-x c++")
+        cmd.extend(["-x", "c++"])
 
         # Always require a compiler path at this point
         if self.__config.compiler_path is None:
@@ -122,37 +219,32 @@ class source_reader_t(object):
                 "pygccxml configuration file."))
 
         # Platform specific options
-        if platform.system() == 'Windows':
+        if _IS_WINDOWS:
             compilers = ("mingw", "g++", "gcc")
             compiler_path = self.__config.compiler_path.lower()
             if any(compiler in compiler_path for compiler in compilers):
                 # Look at the compiler path. This is a bad way
                 # to find out if we are using mingw; but it
                 # should probably work in most of the cases
-                cmd.append('--castxml-cc-gnu ' + self.__config.compiler_path)
+                cmd.extend(['--castxml-cc-gnu', self.__config.compiler_path])
             else:
                 # We are using msvc
-                cmd.append('--castxml-cc-msvc ' +
-                           '"%s"' % self.__config.compiler_path)
+                cmd.extend(['--castxml-cc-msvc', self.__config.compiler_path])
                 if self.__config.compiler == 'msvc9':
-                    cmd.append('"-D_HAS_TR1=0"')
+                    cmd.append('-D_HAS_TR1=0')
         else:
             # On mac or linux, use gcc or clang (the flag is the same)
-            cmd.append('--castxml-cc-gnu ')
-
-            if self.__cxx_std.is_implicit:
-                std_flag = ''
-            else:
-                std_flag = ' ' + self.__cxx_std.stdcxx + ' '
+            cmd.append('--castxml-cc-gnu')
 
-            ccflags = self.__config.ccflags
-            if std_flag:
-                ccflags += std_flag
+            ccflags = self.__split_flags(self.__config.ccflags)
+            if not self.__cxx_std.is_implicit:
+                ccflags.append(self.__cxx_std.stdcxx)
 
             if ccflags:
-                all_cc_opts = self.__config.compiler_path + ' ' + ccflags
-                cmd.append(
-                    '"(" ' + all_cc_opts + ' ")"')
+                cmd.append('(')
+                cmd.append(self.__config.compiler_path)
+                cmd.extend(ccflags)
+                cmd.append(')')
             else:
                 cmd.append(self.__config.compiler_path)
 
@@ -170,20 +262,7 @@ class source_reader_t(object):
             cmd.append('--castxml-gccxml')
 
         # Add symbols
-        cmd = self.__add_symbols(cmd)
-
-        # The destination file
-        cmd.append('-o %s' % xmlfile)
-        # The source file
-        cmd.append('%s' % source_file)
-        # Where to start the parsing
-        if self.__config.start_with_declarations:
-            cmd.append(
-                '--castxml-start "%s"' %
-                ','.join(self.__config.start_with_declarations))
-        cmd_line = ' '.join(cmd)
-        self.logger.debug('castxml cmd: %s', cmd_line)
-        return cmd_line
+        return self.__add_symbols(cmd)
 
     def __add_symbols(self, cmd):
         """
@@ -191,15 +270,8 @@ class source_reader_t(object):
 
         """
 
-        if self.__config.define_symbols:
-            symbols = self.__config.define_symbols
-            cmd.append(''.join(
-                [' -D"%s"' % def_symbol for def_symbol in symbols]))
-
-        if self.__config.undefine_symbols:
-            un_symbols = self.__config.undefine_symbols
-            cmd.append(''.join(
-                [' -U"%s"' % undef_symbol for undef_symbol in un_symbols]))
+        cmd.extend('-D' + symbol for symbol in self.__config.define_symbols)
+        cmd.extend('-U' + symbol for symbol in self.__config.undefine_symbols)
 
         return cmd
 
@@ -220,6 +292,17 @@ class source_reader_t(object):
 
         """
 
+        ffname = source_file
+        if not os.path.isabs(ffname):
+            ffname = self.__file_full_name(source_file)
+        return self.__create_xml_file(ffname, destination)
+
+    def __create_xml_file(self, source_file, destination):
+        """
+        Run the xml generator on a source file, given by its full path.
+
+        """
+
         xml_file = destination
         # If file specified, remove it to start else create new file name
         if xml_file:
@@ -227,59 +310,146 @@ class source_reader_t(object):
         else:
             xml_file = utils.create_temp_file_name(suffix='.xml')
 
-        ffname = source_file
-        if not os.path.isabs(ffname):
-            ffname = self.__file_full_name(source_file)
-        command_line = self.__create_command_line(ffname, xml_file)
+        command_line = self.__create_command_line(source_file, xml_file)
+
+        # The output is collected in a file, and only read if needed
+        with tempfile.TemporaryFile() as output:
+            process = subprocess.run(
+                args=command_line,
+                stdout=output,
+                stderr=subprocess.STDOUT)
+
+            try:
+                self.__check_xml_generator_output_file(
+                    output,
+                    process.returncode,
+                    os.path.isfile(xml_file))
+            except Exception:
+                utils.remove_file_no_raise(xml_file, self.__config)
+                raise
+        return xml_file
+
+    def __check_xml_generator_output_file(
+            self, output, exit_status, xml_exists):
+        """
+        Like :meth:`__check_xml_generator_output`, for an output written to
+        a file. The file is not read when the generator succeeded.
+
+        """
 
-        process = subprocess.Popen(
-            args=command_line,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE)
+        if not exit_status and xml_exists:
+            if self.__config.ignore_gccxml_output or \
+                    not os.fstat(output.fileno()).st_size:
+                return
+        output.seek(0)
+        self.__check_xml_generator_output(
+            output.read(), exit_status, xml_exists)
 
-        try:
-            results = []
-            while process.poll() is None:
-                line = process.stdout.readline()
-                if line.strip():
-                    results.append(line.rstrip())
-            for line in process.stdout.readlines():
-                if line.strip():
-                    results.append(line.rstrip())
-            for line in process.stderr.readlines():
-                if line.strip():
-                    results.append(line.rstrip())
-
-            exit_status = process.returncode
-            msg = os.linesep.join([str(s.decode()) for s in results])
-            if self.__config.ignore_gccxml_output:
-                if not os.path.isfile(xml_file):
+    def __check_xml_generator_output(self, output, exit_status, xml_exists):
+        """
+        Raise a RuntimeError if the xml generator did not succeed.
+
+        :param output: bytes written by the xml generator to stdout/stderr
+        :param exit_status: exit status of the xml generator
+        :param xml_exists: whether the xml output has been produced
+
+        """
+
+        msg = self.__format_xml_generator_output(output)
+        if self.__config.ignore_gccxml_output:
+            if not xml_exists:
+                raise RuntimeError(
+                    "Error occurred while running " +
+                    self.__config.xml_generator.upper() +
+                    ": %s status:%s" %
+                    (msg, exit_status))
+        else:
+            if msg or exit_status or not xml_exists:
+                if not xml_exists:
                     raise RuntimeError(
                         "Error occurred while running " +
                         self.__config.xml_generator.upper() +
-                        ": %s status:%s" %
-                        (msg, exit_status))
-            else:
-                if msg or exit_status or not \
-                        os.path.isfile(xml_file):
-                    if not os.path.isfile(xml_file):
-                        raise RuntimeError(
-                            "Error occurred while running " +
-                            self.__config.xml_generator.upper() +
-                            " xml file does not exist")
-                    else:
-                        raise RuntimeError(
-                            "Error occurred while running " +
-                            self.__config.xml_generator.upper() +
-                            ": %s status:%s" % (msg, exit_status))
-        except Exception:
-            utils.remove_file_no_raise(xml_file, self.__config)
-            raise
+                        " xml file does not exist")
+                else:
+                    raise RuntimeError(
+                        "Error occurred while running " +
+                        self.__config.xml_generator.upper() +
+                        ": %s status:%s" % (msg, exit_status))
+
+    @staticmethod
+    def __format_xml_generator_output(output):
+        # Decode the whole output at once, not line by line
+        lines = output.decode(errors="replace").splitlines()
+        return os.linesep.join(
+            [line.rstrip() for line in lines if line.strip()])
+
+    def __parse_source_file(self, source_file):
+        """
+        Runs the xml generator on a source file and parses its output.
+
+        :param source_file: full path to the C++ source file
+        :type source_file: str
+
+        :rtype: tuple of declarations and files, like
+                :meth:`__parse_xml_file`
+
+        """
+
+        # The xml file is written when it should be kept for debugging
+        if not _IS_WINDOWS and not self.__config.keep_xml:
+            return self.__parse_xml_stream(source_file)
+        xml_file = self.__create_xml_file(source_file, None)
+        try:
+            return self.__parse_xml_file(xml_file)
         finally:
-            process.wait()
-            process.stdout.close()
-        return xml_file
+            utils.remove_file_no_raise(xml_file, self.__config)
+
+    def __parse_xml_stream(self, source_file):
+        """
+        Run the xml generator and parse its output while it is written.
+
+        The xml is read from the generator's stdout, so no intermediate
+        xml file is written to (and read back from) the disk. The stderr
+        output goes to an anonymous temporary file, so that the generator
+        can never block on a full pipe.
+
+        :param source_file: full path to the C++ source file
+        :type source_file: str
+
+        :rtype: tuple of declarations and files, like
+                :meth:`__parse_xml_file`
+
+        """
+
+        command_line = self.__create_command_line(source_file, "-")
+
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                args=command_line,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                bufsize=1 << 20)
+            try:
+                with process.stdout:
+                    result = self.__parse_xml_file(process.stdout)
+            except Exception:
+                # stdout is closed at this point, so the generator can not
+                # block on it. If it failed, its error explains the broken
+                # xml output better than the parser error.
+                exit_status = process.wait()
+                if exit_status > 0:
+                    stderr.seek(0)
+                    raise RuntimeError(
+                        "Error occurred while running " +
+                        self.__config.xml_generator.upper() +
+                        ": %s status:%s" % (
+                            self.__format_xml_generator_output(
+                                stderr.read()),
+                            exit_status))
+                raise
+            exit_status = process.wait()
+            self.__check_xml_generator_output_file(stderr, exit_status, True)
+        return result
 
     def create_xml_file_from_string(self, content, destination=None):
         """
@@ -293,15 +463,11 @@ class source_reader_t(object):
 
         :rtype: returns file name of xml file
         """
-        header_file = utils.create_temp_file_name(suffix='.h')
-
+        header_file = self.__create_header_file(content)
         try:
-            with open(header_file, "w+") as header:
-                header.write(content)
-            xml_file = self.create_xml_file(header_file, destination)
+            return self.__create_xml_file(header_file, destination)
         finally:
             utils.remove_file_no_raise(header_file, self.__config)
-        return xml_file
 
     def read_file(self, source_file):
         return self.read_cpp_source_file(source_file)
@@ -315,31 +481,89 @@ class source_reader_t(object):
 
         """
 
-        xml_file = ''
-        try:
-            ffname = self.__file_full_name(source_file)
-            self.logger.debug("Reading source file: [%s].", ffname)
-            decls = self.__dcache.cached_value(ffname, self.__config)
-            if not decls:
-                self.logger.debug(
-                    "File has not been found in cache, parsing...")
-                xml_file = self.create_xml_file(ffname)
-                decls, files = self.__parse_xml_file(xml_file)
-                self.__dcache.update(
-                    ffname, self.__config, decls, files)
-            else:
-                self.logger.debug((
-                    "File has not been changed, reading declarations " +
-                    "from cache."))
-        except Exception:
-            if xml_file:
-                utils.remove_file_no_raise(xml_file, self.__config)
-            raise
-        if xml_file:
-            utils.remove_file_no_raise(xml_file, self.__config)
+        ffname = self.__file_full_name(source_file)
+        self.logger.debug("Reading source file: [%s].", ffname)
+        decls = self.__dcache.cached_value(ffname, self.__config)
+        if not decls:
+            self.logger.debug(
+                "File has not been found in cache, parsing...")
+            decls, files = self.__parse_source_file(ffname)
+            self.__dcache.update(
+                ffname, self.__config, decls, files)
+        else:
+            self.logger.debug((
+                "File has not been changed, reading declarations " +
+                "from cache."))
 
         return decls
 
+    def read_cpp_source_files(self, source_files, workers=None):
+        """
+        Reads several C++ source files and returns their declarations trees
+
+        The files that are not cached are parsed in parallel, each one in
+        a worker process: both the xml generator and the scanning and
+        linking of its output run concurrently. The cache is only updated
+        from the calling process. The workers are spawned, and import the
+        main module: it must be guarded by ``if __name__ == "__main__":``.
+
+        :param source_files: paths to C++ source files
+        :type source_files: list of str
+
+        :param workers: maximum number of worker processes. None uses the
+                        number of CPUs.
+        :type workers: int
+
+        :rtype: list of declarations trees, in the order of `source_files`
+
+        """
+
+        ffnames = [self.__file_full_name(f) for f in source_files]
+        answer = [
+            self.__dcache.cached_value(ffname, self.__config)
+            for ffname in ffnames]
+        missing = [index for index, decls in enumerate(answer) if not decls]
+        if workers == 1 or len(missing) < 2:
+            for index in missing:
+                answer[index] = self.read_cpp_source_file(ffnames[index])
+            return answer
+
+        # Spawn the workers, like on Windows, so that the behaviour does
+        # not depend on the platform (and no threads get forked)
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(
+                    source_reader_t._read_in_process,
+                    ffnames[index],
+                    self.__config,
+                    self.__decl_factory): index
+                for index in missing}
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    index = futures[future]
+                    decls, files, xml_generator_from_xml_file = \
+                        future.result()
+                    self.__xml_generator_from_xml_file = \
+                        xml_generator_from_xml_file
+                    self.__dcache.update(
+                        ffnames[index], self.__config, decls, files)
+                    answer[index] = decls
+            except Exception:
+                # Do not start parsing the remaining files
+                for future in futures:
+                    future.cancel()
+                raise
+        return answer
+
+    @staticmethod
+    def _read_in_process(source_file, configuration, decl_factory):
+        # Entry point of the read_cpp_source_files() worker processes
+        reader = source_reader_t(configuration, decl_factory=decl_factory)
+        decls, files = reader.__parse_source_file(source_file)
+        return decls, files, reader.xml_generator_from_xml_file
+
     def read_xml_file(self, xml_file):
         """
         Read generated XML file.
@@ -373,29 +597,79 @@ class source_reader_t(object):
 
         """
 
-        header_file = utils.create_temp_file_name(suffix='.h')
-        with open(header_file, "w+") as f:
-            f.write(content)
-
+        header_file = self.__create_header_file(content)
         try:
-            decls = self.read_file(header_file)
-        except Exception:
+            decls, _ = self.__parse_source_file(header_file)
+        finally:
             utils.remove_file_no_raise(header_file, self.__config)
-            raise
-        utils.remove_file_no_raise(header_file, self.__config)
-
         return decls
 
+    @staticmethod
+    def __create_header_file(content):
+        # The code is written to a header instead of the stdin of the xml
+        # generator: quoted includes of code read from stdin are looked up
+        # in the current directory before the include paths.
+        with tempfile.NamedTemporaryFile(
+                "w", suffix='.h', delete=False) as header:
+            header.write(content)
+        return header.name
+
+    def file_full_name(self, file_):
+        """
+        Returns the path of a file, searched for in the working directory
+        and in the include paths.
+
+        :param file_: path to the file
+        :type file_: str
+
+        :rtype: str
+
+        """
+
+        return self.__file_full_name(file_)
+
+    def __existing_directories(self):
+        """
+        Returns the search directories that exist.
+
+        """
+
+        if self.__existing_search_directories is None:
+            self.__existing_search_directories = [
+                path for path in self.__search_directories
+                if os.path.isdir(path)]
+        return self.__existing_search_directories
+
     def __file_full_name(self, file_):
+        file_path = self.__full_names.get(file_)
+        if file_path is not None:
+            return file_path
         if os.path.isfile(file_):
-            return file_
-        for path in self.__search_directories:
-            file_path = os.path.join(path, file_)
-            if os.path.isfile(file_path):
-                return file_path
-        raise RuntimeError("pygccxml error: file '%s' does not exist" % file_)
+            file_path = file_
+        else:
+            for path in self.__existing_directories():
+                if os.path.isfile(os.path.join(path, file_)):
+                    file_path = os.path.join(path, file_)
+                    break
+            else:
+                raise RuntimeError(
+                    "pygccxml error: file '%s' does not exist" % file_)
+        self.__full_names[file_] = file_path
+        return file_path
 
     def __parse_xml_file(self, xml_file):
+        # Scanning and linking create lots of objects, nearly all of them
+        # part of the declarations tree: the cyclic garbage collector would
+        # run over and over without finding anything to free.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self.__scan_and_link(xml_file)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def __scan_and_link(self, xml_file):
         scanner_ = scanner_t(xml_file, self.__decl_factory, self.__config)
         scanner_.read()
         self.__xml_generator_from_xml_file = \
@@ -410,24 +684,25 @@ class source_reader_t(object):
             membership=scanner_.members(),
             files=files,
             xml_generator_from_xml_file=self.__xml_generator_from_xml_file)
-        for type_ in list(types.values()):
+        for type_ in tuple(types.values()):
             # I need this copy because internaly linker change types collection
             linker_.instance = type_
             declarations.apply_visitor(linker_, type_)
+        # While linking, also pick the declarations needed by the next
+        # steps, instead of going through all of them again in each step
+        typedef_t = declarations.typedef_t
+        typedefs = []
         for decl in decls.values():
             linker_.instance = decl
             declarations.apply_visitor(linker_, decl)
-        declarations_joiner.bind_aliases(iter(decls.values()))
+            if isinstance(decl, typedef_t):
+                typedefs.append(decl)
+        declarations_joiner.bind_aliases(typedefs)
 
         # Patch the declarations tree
         if self.__xml_generator_from_xml_file.is_castxml:
-            patcher.update_unnamed_class(decls.values())
+            patcher.update_unnamed_class(typedefs)
         patcher.fix_calldef_decls(
             scanner_.calldefs(), scanner_.enums(), self.__cxx_std)
 
-        decls = [inst for inst in iter(decls.values()) if self.__check(inst)]
-        return decls, list(files.values())
-
-    @staticmethod
-    def __check(inst):
-        return isinstance(inst, declarations.namespace_t) and not inst.parent
+        return scanner_.root_namespaces(), list(files.values())
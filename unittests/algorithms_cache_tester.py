@@ -3,6 +3,7 @@
 # Distributed under the Boost Software License, Version 1.0.
 # See http://www.boost.org/LICENSE_1_0.txt
 
+import pickle
 import unittest
 
 from . import parser_test_case
@@ -60,6 +61,25 @@ class Test(parser_test_case.parser_test_case_t):
         self.assertTrue('public' == cls.find_out_member_access_type(enum))
         self.assertTrue(enum.cache.access_type == 'public')
 
+    def test_pickle(self):
+        cls = self.global_ns.class_(name='class_for_nested_enums_t')
+        cls_full_name = declarations.full_name(cls)
+
+        # The cached values are not pickled, only computed again
+        cls = pickle.loads(pickle.dumps(cls))
+        self.assertIsNone(cls.cache.full_name)
+        self.assertEqual(declarations.full_name(cls), cls_full_name)
+
+        cls.cache.disable()
+        cls = pickle.loads(pickle.dumps(cls))
+        self.assertFalse(cls.cache.enabled)
+
+        type_ = declarations.pointer_t(declarations.int_t())
+        decl_string = type_.decl_string
+        type_ = pickle.loads(pickle.dumps(type_))
+        self.assertIsNone(type_.cache.decl_string)
+        self.assertEqual(type_.decl_string, decl_string)
+
 
 def create_suite():
     suite = unittest.TestSuite()
@@ -7,23 +7,16 @@ import unittest
 
 from . import parser_test_case
 
-from pygccxml import parser
-from pygccxml import declarations
-
 
 class Test(parser_test_case.parser_test_case_t):
 
-    global_ns = None
-
     def __init__(self, *args):
         parser_test_case.parser_test_case_t.__init__(self, *args)
         self.header = 'bit_fields.hpp'
+        self.global_ns = None
 
     def setUp(self):
-        if not Test.global_ns:
-            decls = parser.parse([self.header], self.config)
-            Test.global_ns = declarations.get_global_namespace(decls)
-            Test.global_ns.init_optimizer()
+        self.global_ns = self._parse_global_ns([self.header])
 
     def test(self):
         bf_x = self.global_ns.variable('x')
@@ -4,6 +4,8 @@
 # See http://www.boost.org/LICENSE_1_0.txt
 
 import os
+import pickle
+import tempfile
 import unittest
 import os.path
 
@@ -111,6 +113,86 @@ class Test(parser_test_case.parser_test_case_t):
         cache = declarations_cache.file_cache_t(cache_file)
         self.assertTrue(len(cache._file_cache_t__cache) == 1)
 
+    def test_joined_cache_interface(self):
+        cache_file = os.path.join(
+            autoconfig.build_directory,
+            'decl_cache_test.test_joined_cache.cache')
+        file1 = os.path.join(autoconfig.data_directory, 'decl_cache_file1.txt')
+        file2 = os.path.join(autoconfig.data_directory, 'decl_cache_file2.txt')
+        def_cfg = self.build_differing_cfg_list()[0]
+
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+        cache = declarations_cache.file_cache_t(cache_file)
+        self.assertIsNone(cache.cached_joined_value([file1, file2], def_cfg))
+        cache.update(file1, def_cfg, 1, [])
+        cache.update(file2, def_cfg, 2, [])
+        cache.update_joined([file1, file2], def_cfg, 3)
+        self.assertEqual(cache.cached_joined_value([file1, file2], def_cfg), 3)
+        # The order of the files matters
+        self.assertIsNone(cache.cached_joined_value([file2, file1], def_cfg))
+
+        # Test reading again
+        cache.flush()
+        cache = declarations_cache.file_cache_t(cache_file)
+        self.assertEqual(cache.cached_joined_value([file1, file2], def_cfg), 3)
+
+        # The joined entry is not cached without the entries of the files
+        key = declarations_cache.record_t.create_key(file1, def_cfg)
+        del cache._file_cache_t__cache[key]
+        cache.update_joined([file2, file1], def_cfg, 4)
+        self.assertIsNone(cache.cached_joined_value([file2, file1], def_cfg))
+
+    def test_joined_cache_included_files(self):
+        cache_file = os.path.join(
+            autoconfig.build_directory,
+            'decl_cache_test.test_joined_included.cache')
+        file1 = os.path.join(autoconfig.data_directory, 'decl_cache_file1.txt')
+        file2 = os.path.join(autoconfig.data_directory, 'decl_cache_file2.txt')
+        def_cfg = self.build_differing_cfg_list()[0]
+
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".h", delete=False) as included_file:
+            included_file.write("int a;")
+        try:
+            cache = declarations_cache.file_cache_t(cache_file)
+            cache.update(file1, def_cfg, 1, [included_file.name])
+            cache.update(file2, def_cfg, 2, [])
+            cache.update_joined([file1, file2], def_cfg, 3)
+            self.assertEqual(
+                cache.cached_joined_value([file1, file2], def_cfg), 3)
+
+            # Changing an included file invalidates the joined entry
+            with open(included_file.name, "w") as f:
+                f.write("int b;")
+            self.assertIsNone(
+                cache.cached_joined_value([file1, file2], def_cfg))
+        finally:
+            os.remove(included_file.name)
+
+    def test_cache_from_other_version(self):
+        cache_file = os.path.join(
+            autoconfig.build_directory,
+            'decl_cache_test.test_other_version.cache')
+        file1 = os.path.join(autoconfig.data_directory, 'decl_cache_file1.txt')
+        def_cfg = self.build_differing_cfg_list()[0]
+
+        cache = declarations_cache.file_cache_t(cache_file)
+        cache.update(file1, def_cfg, 1, [])
+        cache.flush()
+        cache = declarations_cache.file_cache_t(cache_file)
+        self.assertEqual(cache.cached_value(file1, def_cfg), 1)
+
+        # Cache file without version, as written by older versions
+        with open(cache_file, "wb") as f:
+            pickle.dump(cache._file_cache_t__cache, f)
+        cache = declarations_cache.file_cache_t(cache_file)
+        self.assertIsNone(cache.cached_value(file1, def_cfg))
+
     @staticmethod
     def build_differing_cfg_list():
         """ Return a list of configurations that all differ. """
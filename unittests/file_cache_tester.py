@@ -5,6 +5,8 @@
 
 import os
 import sys
+import shutil
+import tempfile
 import unittest
 import subprocess
 
@@ -12,6 +14,7 @@ from . import autoconfig
 from . import parser_test_case
 
 from pygccxml import parser
+from pygccxml import declarations
 
 
 class Test(parser_test_case.parser_test_case_t):
@@ -82,6 +85,39 @@ class Test(parser_test_case.parser_test_case_t):
             ("cached declarations and source declarations are different, " +
                 "after pickling"))
 
+    def test_joined_included_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            header_a = os.path.join(directory, "a.h")
+            header_b = os.path.join(directory, "b.h")
+            header_c = os.path.join(directory, "c.h")
+            with open(header_a, "w") as f:
+                f.write('#include "b.h"\nint a;\n')
+            with open(header_b, "w") as f:
+                f.write("int b1;\n")
+            with open(header_c, "w") as f:
+                f.write("int c;\n")
+            cache = parser.file_cache_t(self.cache_file)
+            mode = parser.COMPILATION_MODE.FILE_BY_FILE
+
+            decls = parser.parse(
+                [header_a, header_c], self.config, mode, cache)
+            global_ns = declarations.get_global_namespace(decls)
+            self.assertTrue(global_ns.variable("b1"))
+
+            # The joined declarations are read again when an included file
+            # changed, even if the entry of the file is up to date
+            with open(header_b, "w") as f:
+                f.write("int b2;\n")
+            parser.parse([header_a], self.config, mode, cache)
+            decls = parser.parse(
+                [header_a, header_c], self.config, mode, cache)
+            global_ns = declarations.get_global_namespace(decls)
+            self.assertTrue(global_ns.variable("b2"))
+            self.assertFalse(global_ns.variables("b1", allow_empty=True))
+        finally:
+            shutil.rmtree(directory)
+
 
 def create_suite():
     suite = unittest.TestSuite()
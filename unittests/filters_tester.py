@@ -12,7 +12,6 @@ from pygccxml import declarations
 
 
 class Test(parser_test_case.parser_test_case_t):
-    global_ns = None
     COMPILATION_MODE = parser.COMPILATION_MODE.ALL_AT_ONCE
 
     def __init__(self, *args):
@@ -21,14 +20,9 @@ class Test(parser_test_case.parser_test_case_t):
         self.global_ns = None
 
     def setUp(self):
-        if not Test.global_ns:
-            decls = parser.parse([self.header], self.config)
-            Test.global_ns = declarations.get_global_namespace(decls)
-            Test.global_ns.init_optimizer()
-            Test.xml_generator_from_xml_file = \
-                self.config.xml_generator_from_xml_file
-        self.global_ns = Test.global_ns
-        self.xml_generator_from_xml_file = Test.xml_generator_from_xml_file
+        self.global_ns = self._parse_global_ns([self.header])
+        self.xml_generator_from_xml_file = \
+            self.config.xml_generator_from_xml_file
 
     def test_regex(self):
         criteria = declarations.regex_matcher_t(
@@ -9,6 +9,13 @@ import unittest
 
 from . import autoconfig
 
+from pygccxml import parser
+from pygccxml import declarations
+
+# Global namespaces of the headers already parsed by the tests, shared by
+# all the test cases parsing the same headers with the same configuration.
+_global_namespaces = {}
+
 
 class parser_test_case_t(unittest.TestCase):
 
@@ -41,6 +48,33 @@ class parser_test_case_t(unittest.TestCase):
                 name + " " +
                 str(time.time() - start_time) + "\n")
 
+    def _parse_global_ns(self, headers):
+        """
+        Parse the headers and return their global namespace.
+
+        The headers are only parsed once for a given configuration, and
+        the declarations tree is shared by all the test cases that need
+        it: the tests must not modify it.
+
+        """
+        config = self.config
+        key = (
+            tuple(headers),
+            parser.declarations_cache.configuration_signature(config),
+            config.compiler_path,
+            config.ccflags,
+            config.castxml_epic_version,
+            tuple(config.flags))
+        if key not in _global_namespaces:
+            decls = parser.parse(headers, config)
+            global_ns = declarations.get_global_namespace(decls)
+            global_ns.init_optimizer()
+            _global_namespaces[key] = (
+                global_ns, config.xml_generator_from_xml_file)
+        global_ns, xml_generator_from_xml_file = _global_namespaces[key]
+        config.xml_generator_from_xml_file = xml_generator_from_xml_file
+        return global_ns
+
     def _test_type_composition(self, type_, expected_compound, expected_base):
         self.assertTrue(
             isinstance(type_, expected_compound),
@@ -91,6 +91,20 @@ class tester2_t(parser_test_case.parser_test_case_t):
             src_decls == prj_decls,
             "There is a difference between declarations")
 
+    def test_parallel(self):
+        prj_reader = parser.project_reader_t(self.config)
+        prj_decls = prj_reader.read_files(
+            self.__files,
+            compilation_mode=parser.COMPILATION_MODE.FILE_BY_FILE)
+        parallel_reader = parser.project_reader_t(self.config, jobs=3)
+        parallel_decls = parallel_reader.read_files(
+            self.__files,
+            compilation_mode=parser.COMPILATION_MODE.FILE_BY_FILE)
+
+        self.assertTrue(
+            parallel_decls == prj_decls,
+            "There is a difference between declarations")
+
 
 def create_suite():
     suite = unittest.TestSuite()
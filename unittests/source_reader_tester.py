@@ -5,15 +5,17 @@
 
 import unittest
 import os
+import shutil
+import tempfile
 
 from . import parser_test_case
 
 from pygccxml import parser
 from pygccxml import declarations
+from pygccxml.parser import source_reader
 
 
 class Test(parser_test_case.parser_test_case_t):
-    global_ns = None
 
     def __init__(self, *args):
         parser_test_case.parser_test_case_t.__init__(self, *args)
@@ -21,11 +23,7 @@ class Test(parser_test_case.parser_test_case_t):
         self.global_ns = None
 
     def setUp(self):
-        if not Test.global_ns:
-            decls = parser.parse([self.header], self.config)
-            Test.global_ns = declarations.get_global_namespace(decls)
-            Test.global_ns.init_optimizer()
-        self.global_ns = Test.global_ns
+        self.global_ns = self._parse_global_ns([self.header])
 
     def test_compound_argument_type(self):
         do_smth = self.global_ns.calldefs('do_smth')
@@ -43,6 +41,91 @@ class Test(parser_test_case.parser_test_case_t):
 
         self.assertIn(err_str, e_context.exception.args[0])
 
+    def test_read_cpp_source_files(self):
+        headers = ['core_ns_join_1.hpp', 'core_ns_join_2.hpp']
+        reader = parser.source_reader_t(self.config)
+        parallel = reader.read_cpp_source_files(headers, workers=2)
+        serial = [reader.read_cpp_source_file(header) for header in headers]
+        self.assertEqual(len(parallel), len(headers))
+        for decls, expected in zip(parallel, serial):
+            self.assertEqual(
+                declarations.get_global_namespace(decls),
+                declarations.get_global_namespace(expected))
+
+    def test_keep_xml(self):
+        config = self.config.clone()
+        config.keep_xml = True
+        reader = parser.source_reader_t(config)
+        old_tempdir = tempfile.tempdir
+        with tempfile.TemporaryDirectory() as directory:
+            tempfile.tempdir = directory
+            try:
+                reader.read_cpp_source_file('core_ns_join_1.hpp')
+            finally:
+                tempfile.tempdir = old_tempdir
+            xml_files = [
+                name for name in os.listdir(directory)
+                if name.endswith('.xml')]
+            self.assertEqual(len(xml_files), 1)
+
+    def test_configuration_copy(self):
+        config = self.config.clone()
+        reader = parser.source_reader_t(config)
+        config.define_symbols.append('PYGCCXML_DEFINED')
+        decls = reader.read_string(
+            '#ifdef PYGCCXML_DEFINED\nint defined_variable;\n#endif\n')
+        global_ns = declarations.get_global_namespace(decls)
+        self.assertFalse(global_ns.variables(
+            'defined_variable', allow_empty=True))
+
+    def test_read_string_include_paths(self):
+        # A header of the current directory must not shadow the one of the
+        # include paths
+        include_directory = tempfile.mkdtemp()
+        current_directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            with open(os.path.join(include_directory, "x.h"), "w") as f:
+                f.write("int from_include_path;")
+            with open(os.path.join(current_directory, "x.h"), "w") as f:
+                f.write("int from_current_directory;")
+            config = self.config.clone()
+            config.include_paths.append(include_directory)
+            os.chdir(current_directory)
+            decls = parser.parse_string('#include "x.h"', config)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(include_directory)
+            shutil.rmtree(current_directory)
+        global_ns = declarations.get_global_namespace(decls)
+        self.assertTrue(global_ns.variable("from_include_path"))
+
+    def test_configuration_subclass(self):
+        class config_t(parser.xml_generator_configuration_t):
+            def __init__(self, config):
+                parser.xml_generator_configuration_t.__init__(
+                    self,
+                    xml_generator_path=config.xml_generator_path,
+                    xml_generator=config.xml_generator,
+                    compiler_path=config.compiler_path,
+                    include_paths=config.include_paths,
+                    cflags=config.cflags,
+                    ccflags=config.ccflags)
+
+        decls = parser.parse_string('int x;', config_t(self.config))
+        self.assertTrue(
+            declarations.get_global_namespace(decls).variable('x'))
+
+    def test_split_windows_flags(self):
+        split = source_reader._split_windows_flags
+        self.assertEqual(
+            split(r'-I"C:\Program Files\inc" -DX'),
+            [r'-IC:\Program Files\inc', '-DX'])
+        self.assertEqual(split('-DA=\\"b\\"  C:\\dir\\'),
+                         ['-DA="b"', 'C:\\dir\\'])
+        self.assertEqual(split(r'"a""b" \\"c d"'), ['a"b', '\\c d'])
+        self.assertEqual(split(''), [])
+
 
 def create_suite():
     suite = unittest.TestSuite()
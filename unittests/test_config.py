@@ -64,6 +64,85 @@ class Test(unittest.TestCase):
         self.assertRaises(
             RuntimeError, lambda: parser.parse_string(code, config))
 
+    def test_clone(self):
+        """Test that a cloned config does not share its lists."""
+
+        generator_path, name = utils.find_xml_generator()
+        config = parser.xml_generator_configuration_t(
+            xml_generator_path=generator_path,
+            xml_generator=name,
+            include_paths=["include"],
+            define_symbols=["A=1"],
+            cflags="-std=c++11",
+            compiler_path="/usr/bin/c++")
+        cloned = config.clone()
+
+        for name in ("xml_generator_path", "xml_generator", "include_paths",
+                     "define_symbols", "cflags", "compiler_path"):
+            self.assertEqual(getattr(cloned, name), getattr(config, name))
+
+        cloned.include_paths.append("other")
+        cloned.define_symbols.append("B=2")
+        self.assertEqual(config.include_paths, ["include"])
+        self.assertEqual(config.define_symbols, ["A=1"])
+
+        class config_t(parser.xml_generator_configuration_t):
+            def __init__(self, path):
+                parser.xml_generator_configuration_t.__init__(
+                    self, xml_generator_path=path, xml_generator="castxml",
+                    start_with_declarations=["ns"], cflags="-DA")
+                self.extra = 1
+
+        config = config_t(generator_path)
+        config.append_cflags("-DB")
+        cloned = config.clone()
+        self.assertIs(type(cloned), config_t)
+        self.assertEqual(cloned.extra, 1)
+        self.assertEqual(cloned.cflags, config.cflags)
+        cloned.start_with_declarations.append("other")
+        cloned.append_cflags("-DC")
+        self.assertEqual(config.start_with_declarations, ["ns"])
+        self.assertEqual(config.cflags, "-DA -DB")
+
+    def test_revalidate_after_change(self):
+        """Test that changed settings are validated again."""
+
+        generator_path, name = utils.find_xml_generator()
+        config = parser.xml_generator_configuration_t(
+            xml_generator_path=generator_path,
+            xml_generator=name)
+        config.raise_on_wrong_settings()
+
+        config.include_paths.append("doesnt/exist")
+        self.assertWarns(RuntimeWarning, config.raise_on_wrong_settings)
+        config.include_paths.pop()
+
+        config.xml_generator_path = "wrong/path"
+        self.assertRaises(RuntimeError, config.raise_on_wrong_settings)
+
+    def test_load_keep_xml(self):
+        """Test that keep_xml is converted to a boolean when loaded."""
+
+        config = parser.load_xml_generator_configuration(
+            os.path.join(os.path.dirname(__file__), "xml_generator.cfg"),
+            keep_xml="false")
+        self.assertIs(config.keep_xml, False)
+
+        config = parser.load_xml_generator_configuration(
+            os.path.join(os.path.dirname(__file__), "xml_generator.cfg"),
+            keep_xml="True")
+        self.assertIs(config.keep_xml, True)
+
+        config = parser.load_xml_generator_configuration(
+            os.path.join(os.path.dirname(__file__), "xml_generator.cfg"),
+            keep_xml=1)
+        self.assertIs(config.keep_xml, True)
+
+        config = parser.load_xml_generator_configuration(
+            os.path.join(os.path.dirname(__file__), "xml_generator.cfg"),
+            keep_xml=None)
+        self.assertIs(config.keep_xml, False)
+
 
 def create_suite():
     suite = unittest.TestSuite()
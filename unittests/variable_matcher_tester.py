@@ -51,7 +51,6 @@ class tester_1_t(parser_test_case.parser_test_case_t):
 
 class tester_2_t(parser_test_case.parser_test_case_t):
     COMPILATION_MODE = parser.COMPILATION_MODE.ALL_AT_ONCE
-    global_ns = None
 
     def __init__(self, *args):
         parser_test_case.parser_test_case_t.__init__(self, *args)
@@ -59,9 +58,7 @@ class tester_2_t(parser_test_case.parser_test_case_t):
         self.global_ns = None
 
     def setUp(self):
-        if not self.global_ns:
-            self.global_ns = declarations.get_global_namespace(
-                parser.parse([self.header], self.config))
+        self.global_ns = self._parse_global_ns([self.header])
 
     def test_no_defaults(self):
         self.global_ns.decls(lambda decl: 'vector<' in decl.name)
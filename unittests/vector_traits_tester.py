@@ -13,7 +13,6 @@ from pygccxml import declarations
 
 class Test(parser_test_case.parser_test_case_t):
     COMPILATION_MODE = parser.COMPILATION_MODE.ALL_AT_ONCE
-    global_ns = None
 
     def __init__(self, *args):
         parser_test_case.parser_test_case_t.__init__(self, *args)
@@ -21,10 +20,7 @@ class Test(parser_test_case.parser_test_case_t):
         self.global_ns = None
 
     def setUp(self):
-        if not Test.global_ns:
-            decls = parser.parse([self.header], self.config)
-            Test.global_ns = declarations.get_global_namespace(decls)
-        self.global_ns = Test.global_ns
+        self.global_ns = self._parse_global_ns([self.header])
 
     def validate_yes(self, value_type, container):
         traits = declarations.vector_traits